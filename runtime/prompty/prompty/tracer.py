@@ -1,30 +1,58 @@
+import atexit
 import contextlib
-import importlib
+import importlib.metadata
 import inspect
 import json
+import logging
 import os
+import queue
+import re
+import threading
+import time
 import traceback
+from collections import Counter
 from collections.abc import Iterator
 from dataclasses import asdict, is_dataclass
-from datetime import datetime
-from functools import partial, wraps
+from datetime import datetime, timedelta
+from functools import cache, lru_cache, partial, wraps
 from numbers import Number
 from pathlib import Path
 from typing import Any, Callable, Union
 
+# optional, used for faster trace file serialization when installed
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# substrings that mark a key as holding a sensitive value
+_SENSITIVE = re.compile("key|secret|password|credential", re.IGNORECASE)
+_MASK = 10 * "*"
+
+
+# payloads reuse a small set of keys, so remember each verdict
+@lru_cache(maxsize=1024)
+def _is_sensitive(key: str) -> bool:
+    return _SENSITIVE.search(key) is not None
+
 
 # clean up key value pairs for sensitive values
 def sanitize(key: str, value: Any) -> Any:
-    if isinstance(value, str) and any(
-        [s in key.lower() for s in ["key", "secret", "password", "credential"]]
-    ):
-        return 10 * "*"
+    if isinstance(value, str) and _is_sensitive(key):
+        return _MASK
     elif isinstance(value, dict):
         return {k: sanitize(k, v) for k, v in value.items()}
     else:
         return value
 
 
+# handed out by Tracer.start when nothing is listening
+def _no_trace(key: str, value: Any) -> list[None]:
+    return []
+
+
 class Tracer:
     _tracers: dict[
         str,
@@ -32,6 +60,17 @@ class Tracer:
             [str], contextlib._GeneratorContextManager[Callable[[str, Any], None]]
         ],
     ] = {}
+    # snapshot of _tracers.values() for the per-call paths
+    _tracers_tuple: tuple[
+        Callable[
+            [str], contextlib._GeneratorContextManager[Callable[[str, Any], None]]
+        ],
+        ...,
+    ] = ()
+
+    # read when a function is decorated, when False the wrapper is built
+    # without the try/except that records exceptions as the result
+    capture_exceptions: bool = True
 
     SIGNATURE = "signature"
     INPUTS = "inputs"
@@ -46,19 +85,25 @@ class Tracer:
         ],
     ) -> None:
         cls._tracers[name] = tracer
+        cls._tracers_tuple = tuple(cls._tracers.values())
 
     @classmethod
     def clear(cls) -> None:
         cls._tracers = {}
+        cls._tracers_tuple = ()
 
     @classmethod
     @contextlib.contextmanager
     def start(
         cls, name: str, attributes: Union[dict[str, Any], None] = None
     ) -> Iterator[Callable[[str, Any], list[None]]]:
+        if not cls._tracers_tuple:
+            yield _no_trace
+            return
+
         with contextlib.ExitStack() as stack:
             traces: list[Callable[[str, Any], None]] = [
-                stack.enter_context(tracer(name)) for tracer in cls._tracers.values()
+                stack.enter_context(tracer(name)) for tracer in cls._tracers_tuple
             ]
 
             if attributes:
@@ -66,38 +111,109 @@ class Tracer:
                     for key, value in attributes.items():
                         trace(key, value)
 
-            yield lambda key, value: [
-                # normalize and sanitize any trace values
-                trace(key, sanitize(key, to_dict(value)))
-                for trace in traces
-            ]
+            def trace_all(key: str, value: Any) -> list[None]:
+                # normalize and sanitize once for every tracer
+                value = to_dict(value, key)
+                return [trace(key, value) for trace in traces]
+
+            yield trace_all
+
+
+def _identity(obj: Any, key: Union[str, None]) -> Any:
+    return obj
+
+
+def _datetime_to_dict(obj: datetime, key: Union[str, None]) -> str:
+    return obj.isoformat()
+
+
+def _path_to_dict(obj: Path, key: Union[str, None]) -> str:
+    return str(obj)
+
+
+# json-safe leaves, kept as-is by the container loops
+# without a call back into to_dict
+_LEAVES = frozenset((str, int, float, bool))
 
 
-def to_dict(obj: Any) -> Any:
+def _list_to_dict(obj: list, key: Union[str, None]) -> list:
+    # like sanitize, list items are not checked against the key
+    return [item if type(item) in _LEAVES else to_dict(item) for item in obj]
+
+
+def _dict_to_dict(obj: dict, key: Union[str, None]) -> dict:
+    if key is None:
+        return {k: v if type(v) in _LEAVES else to_dict(v) for k, v in obj.items()}
+
+    # keep sanitizing, each value against its own key
+    result = {}
+    for k, v in obj.items():
+        if type(v) is str:
+            result[k] = _MASK if _is_sensitive(str(k)) else v
+        elif type(v) in _LEAVES:
+            result[k] = v
+        else:
+            result[k] = to_dict(v, str(k))
+    return result
+
+
+# handlers keyed on the exact type of the common cases; anything
+# else (subclasses included) falls through to the checks in _to_dict
+_DISPATCH: dict[type, Callable[[Any, Union[str, None]], Any]] = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    datetime: _datetime_to_dict,
+    list: _list_to_dict,
+    dict: _dict_to_dict,
+    # concrete PosixPath / WindowsPath for this platform
+    type(Path()): _path_to_dict,
+}
+
+
+def to_dict(obj: Any, key: Union[str, None] = None) -> Any:
+    # when a key is given the value is sanitized in the same pass,
+    # any string stored under a sensitive key comes back masked
+    handler = _DISPATCH.get(type(obj))
+    if handler is not None:
+        value = handler(obj, key)
+    else:
+        value = _to_dict(obj, key)
+
+    if key is not None and isinstance(value, str) and _is_sensitive(key):
+        return _MASK
+    return value
+
+
+def _to_dict(obj: Any, key: Union[str, None]) -> Any:
     # simple json types
-    if isinstance(obj, str) or isinstance(obj, Number) or isinstance(obj, bool):
+    if isinstance(obj, (str, Number)):
         return obj
     # datetime
     elif isinstance(obj, datetime):
         return obj.isoformat()
+
+    # look the type name up once for the name based checks below
+    type_name = type(obj).__name__
     # safe Prompty obj serialization
-    elif type(obj).__name__ == "Prompty":
+    if type_name == "Prompty":
         obj_dict = asdict(obj)
         if "model" in obj_dict and "configuration" in obj_dict["model"]:
             obj_dict["model"]["configuration"] = sanitize("configuration", obj_dict["model"]["configuration"])
-        return obj_dict
+        return _dict_to_dict(obj_dict, key)
     # safe PromptyStream obj serialization
-    elif type(obj).__name__ == "PromptyStream":
+    elif type_name == "PromptyStream":
         return "PromptyStream"
     elif is_dataclass(obj) and not isinstance(obj, type):
-        return asdict(obj)
-    elif type(obj).__name__ == "AsyncPromptyStream":
+        return _dict_to_dict(asdict(obj), key)
+    elif type_name == "AsyncPromptyStream":
         return "AsyncPromptyStream"
     # recursive list and dict
     elif isinstance(obj, list):
-        return [to_dict(item) for item in obj]
+        return _list_to_dict(obj, key)
     elif isinstance(obj, dict):
-        return {k: v if isinstance(v, str) else to_dict(v) for k, v in obj.items()}
+        return _dict_to_dict(obj, key)
     elif isinstance(obj, Path):
         return str(obj)
     # cast to string otherwise...
@@ -105,7 +221,8 @@ def to_dict(obj: Any) -> Any:
         return str(obj)
 
 
-def _name(func: Callable, args):
+def _namer(func: Callable) -> Callable[[tuple], tuple[str, str]]:
+    # resolve the name and signature once, at decoration time
     if hasattr(func, "__qualname__"):
         signature = f"{func.__module__}.{func.__qualname__}"
     else:
@@ -114,133 +231,194 @@ def _name(func: Callable, args):
     # core invoker gets special treatment prompty.invoker.Invoker
     core_invoker = signature.startswith("prompty.invoker.Invoker.run")
     if core_invoker:
-        name = type(args[0]).__name__
-        if signature.endswith("async"):
-            signature = (
-                f"{args[0].__module__}.{args[0].__class__.__name__}.invoke_async"
+        method = "invoke_async" if signature.endswith("async") else "invoke"
+
+        # the traced name comes from the concrete invoker on each call
+        def invoker_name(args: tuple) -> tuple[str, str]:
+            invoker = args[0]
+            return (
+                type(invoker).__name__,
+                f"{invoker.__module__}.{invoker.__class__.__name__}.{method}",
             )
-        else:
-            signature = f"{args[0].__module__}.{args[0].__class__.__name__}.invoke"
-    else:
-        name = func.__name__
 
-    return name, signature
+        return invoker_name
 
+    name = (func.__name__, signature)
+    return lambda args: name
 
-def _inputs(func: Callable, args, kwargs) -> dict:
-    ba = inspect.signature(func).bind(*args, **kwargs)
+
+# functions decorated again at runtime (trace(fn) inside a call)
+# reuse the signature instead of parsing it every time
+_signature = lru_cache(maxsize=1024)(inspect.signature)
+
+
+def _inputs(
+    func: Callable, args, kwargs, signature: Union[inspect.Signature, None] = None
+) -> dict:
+    if signature is None:
+        signature = inspect.signature(func)
+    ba = signature.bind(*args, **kwargs)
     ba.apply_defaults()
 
-    inputs = {k: to_dict(v) for k, v in ba.arguments.items() if k != "self"}
+    inputs = {k: v for k, v in ba.arguments.items() if k != "self"}
 
     return inputs
 
 
-def _results(result: Any) -> Any:
-    return to_dict(result) if result is not None else "None"
+def _binder(func: Callable) -> Callable[[tuple, dict], dict]:
+    # inspect the signature once, at decoration time, and map plain
+    # positional-or-keyword parameters without a BoundArguments per call
+    try:
+        signature = _signature(func)
+    except (TypeError, ValueError):
+        # no signature, or an unhashable callable, bind on each call instead
+        return partial(_inputs, func)
+
+    params = list(signature.parameters.values())
+    if any(p.kind is not inspect.Parameter.POSITIONAL_OR_KEYWORD for p in params):
+        return partial(_inputs, func, signature=signature)
+
+    names = tuple(p.name for p in params)
+    positions = {name: i for i, name in enumerate(names)}
+    defaults = {p.name: p.default for p in params if p.default is not inspect.Parameter.empty}
+
+    def bind(args: tuple, kwargs: dict) -> dict:
+        count = len(args)
+        # anything unusual (bad arity, unknown or duplicate keywords) goes
+        # through inspect so errors surface exactly as before
+        if count > len(names) or any(positions.get(k, -1) < count for k in kwargs):
+            return _inputs(func, args, kwargs, signature)
+
+        values = {**defaults, **dict(zip(names, args)), **kwargs}
+        if len(values) != len(names):
+            return _inputs(func, args, kwargs, signature)
+
+        return {name: values[name] for name in names if name != "self"}
+
+    return bind
+
+
+def _exception(e: Exception) -> dict[str, Any]:
+    # only reached with tracers registered, see the early return in the wrappers
+    return {
+        "exception": {
+            "type": e.__class__.__qualname__,
+            "traceback": traceback.format_exception(type(e), e, e.__traceback__),
+            "message": str(e),
+            "args": e.args,
+        }
+    }
 
 
+@contextlib.contextmanager
+def _start(
+    names: Callable[[tuple], tuple[str, str]],
+    bind: Callable[[tuple, dict], dict],
+    override: Union[str, None],
+    okwargs: dict[str, Any],
+    args: tuple,
+    kwargs: dict,
+) -> Iterator[Callable[[str, Any], list[None]]]:
+    # opens the trace and records everything before the call itself,
+    # shared by the sync and async wrappers
+    name, signature = names(args)
+    altname: Union[str, None] = None
+    # special case
+    if override is not None:
+        altname = name
+        name = override
+
+    with Tracer.start(name) as trace:
+        if altname is not None:
+            trace("function", altname)
+
+        trace("signature", signature)
+
+        # support arbitrary keyword
+        # arguments for trace decorator
+        for k, v in okwargs.items():
+            trace(k, v)
+
+        inputs = bind(args, kwargs)
+        trace("inputs", inputs)
+
+        yield trace
+
+
+# the wrapped function is called directly from the wrapper, loaders such
+# as prompty.load expect exactly one trace frame above them on the stack
 def _trace_sync(func: Callable, **okwargs: Any) -> Callable:
+    start = partial(_start, _namer(func), _binder(func), okwargs.pop("name", None), okwargs)
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        name, signature = _name(func, args)
-        altname: Union[str, None] = None
-        # special case
-        if "name" in okwargs:
-            altname = name
-            name = okwargs["name"]
-            del okwargs["name"]
+    if not Tracer.capture_exceptions:
 
-        with Tracer.start(name) as trace:
-            if altname is not None:
-                trace("function", altname)
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # nothing is listening, skip naming and serializing entirely
+            if not Tracer._tracers_tuple:
+                return func(*args, **kwargs)
 
-            trace("signature", signature)
+            with start(args, kwargs) as trace:
+                result = func(*args, **kwargs)
+                trace("result", result)
+                return result
 
-            # support arbitrary keyword
-            # arguments for trace decorator
-            for k, v in okwargs.items():
-                trace(k, to_dict(v))
+        return wrapper
 
-            inputs = _inputs(func, args, kwargs)
-            trace("inputs", inputs)
+    @wraps(func)
+    def capture_wrapper(*args, **kwargs):
+        # nothing is listening, skip naming and serializing entirely
+        if not Tracer._tracers_tuple:
+            return func(*args, **kwargs)
 
+        with start(args, kwargs) as trace:
             try:
                 result = func(*args, **kwargs)
-                trace("result", _results(result))
+                trace("result", result)
             except Exception as e:
-                trace(
-                    "result",
-                    {
-                        "exception": {
-                            "type": type(e),
-                            "traceback": (
-                                traceback.format_tb(tb=e.__traceback__)
-                                if e.__traceback__
-                                else None
-                            ),
-                            "message": str(e),
-                            "args": to_dict(e.args),
-                        }
-                    },
-                )
-                raise e
+                trace("result", _exception(e))
+                raise
 
             return result
 
-    return wrapper
+    return capture_wrapper
 
 
 def _trace_async(func: Callable, **okwargs: Any) -> Callable:
+    start = partial(_start, _namer(func), _binder(func), okwargs.pop("name", None), okwargs)
+
+    if not Tracer.capture_exceptions:
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            # nothing is listening, skip naming and serializing entirely
+            if not Tracer._tracers_tuple:
+                return await func(*args, **kwargs)
+
+            with start(args, kwargs) as trace:
+                result = await func(*args, **kwargs)
+                trace("result", result)
+                return result
+
+        return wrapper
 
     @wraps(func)
-    async def wrapper(*args, **kwargs):
-        name, signature = _name(func, args)
-        altname: Union[str, None] = None
-        # special case
-        if "name" in okwargs:
-            altname = name
-            name = okwargs["name"]
-            del okwargs["name"]
-
-        with Tracer.start(name) as trace:
-            if altname is not None:
-                trace("function", altname)
-
-            trace("signature", signature)
-
-            # support arbitrary keyword
-            # arguments for trace decorator
-            for k, v in okwargs.items():
-                trace(k, to_dict(v))
-
-            inputs = _inputs(func, args, kwargs)
-            trace("inputs", inputs)
+    async def capture_wrapper(*args, **kwargs):
+        # nothing is listening, skip naming and serializing entirely
+        if not Tracer._tracers_tuple:
+            return await func(*args, **kwargs)
+
+        with start(args, kwargs) as trace:
             try:
                 result = await func(*args, **kwargs)
-                trace("result", _results(result))
+                trace("result", result)
             except Exception as e:
-                trace(
-                    "result",
-                    {
-                        "exception": {
-                            "type": type(e),
-                            "traceback": (
-                                traceback.format_tb(tb=e.__traceback__)
-                                if e.__traceback__
-                                else None
-                            ),
-                            "message": str(e),
-                            "args": to_dict(e.args),
-                        }
-                    },
-                )
-                raise e
+                trace("result", _exception(e))
+                raise
 
             return result
 
-    return wrapper
+    return capture_wrapper
 
 
 def trace(func: Union[Callable, None] = None, **kwargs: Any) -> Callable:
@@ -250,12 +428,141 @@ def trace(func: Union[Callable, None] = None, **kwargs: Any) -> Callable:
     return wrapped_method(func, **kwargs)
 
 
+@cache
+def _version() -> str:
+    # looked up on first write rather than at import, so importing the
+    # tracer does not depend on installed package metadata
+    return importlib.metadata.version("prompty")
+
+
+@cache
+def _default_output(cwd: str) -> Path:
+    # resolved once per working directory
+    return (Path(cwd) / ".runs").resolve()
+
+
+def _json_default(obj: Any) -> Any:
+    # frame timestamps stay datetimes until the trace is written
+    if isinstance(obj, datetime):
+        return obj.strftime("%Y-%m-%dT%H:%M:%S.%f")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _merge_usage(dst: Counter, src: Any) -> None:
+    # only numeric counters are summed, nested details are skipped
+    if isinstance(src, dict):
+        dst.update({k: v for k, v in src.items() if isinstance(v, Number)})
+
+
+# trace files are written by one daemon thread so traced calls do
+# not wait on the disk, an Event in the queue marks a flush point
+_writes: queue.SimpleQueue[Union[tuple[Path, bytes], threading.Event]] = queue.SimpleQueue()
+_writer: Union[threading.Thread, None] = None
+_writer_lock = threading.Lock()
+
+
+def _drain_writes() -> None:
+    while True:
+        item = _writes.get()
+        if isinstance(item, threading.Event):
+            item.set()
+            continue
+
+        trace_file, data = item
+        try:
+            with open(trace_file, "wb") as f:
+                f.write(data)
+        except Exception:
+            logger.exception("Unable to write trace file %s", trace_file)
+
+
+def _submit_write(trace_file: Path, data: bytes) -> None:
+    global _writer
+    # started on first use
+    if _writer is None or not _writer.is_alive():
+        with _writer_lock:
+            if _writer is None or not _writer.is_alive():
+                _writer = threading.Thread(
+                    target=_drain_writes, name="prompty-trace-writer", daemon=True
+                )
+                _writer.start()
+
+    _writes.put((trace_file, data))
+
+
+def _flush_writes(timeout: Union[float, None] = None) -> bool:
+    if _writer is None or not _writer.is_alive():
+        return True
+
+    done = threading.Event()
+    _writes.put(done)
+    if not done.wait(timeout):
+        logger.warning("Timed out after %ss waiting for trace files to be written", timeout)
+        return False
+    return True
+
+
+# bounded, a hung filesystem must not block interpreter shutdown
+atexit.register(_flush_writes, 10.0)
+
+
+def _reset_writes() -> None:
+    global _writes, _writer, _writer_lock
+    # a forked child starts empty instead of writing the parent's
+    # pending trace files a second time
+    _writes = queue.SimpleQueue()
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writes)
+
+
+def _dumps(obj: Any) -> bytes:
+    # both paths produce the same document, orjson is only faster
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            # orjson.JSONEncodeError, e.g. integers beyond 64 bits
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+class _Frame:
+    # collects the values traced into a single PromptyTracer frame
+    __slots__ = ("data", "multi")
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.data = data
+        # keys already holding a list of several traced values
+        self.multi: set[str] = set()
+
+    def add(self, key: str, value: Any) -> None:
+        data = self.data
+        if key in self.multi:
+            data[key].append(value)
+        # multiple values creates list
+        elif key in data:
+            data[key] = [data[key], value]
+            self.multi.add(key)
+        else:
+            data[key] = value
+
+
 class PromptyTracer:
     def __init__(self, output_dir: Union[str, None] = None) -> None:
         if output_dir:
             self.output = Path(output_dir).resolve().absolute()
         else:
-            self.output = Path(Path(os.getcwd()) / ".runs").resolve().absolute()
+            self.output = _default_output(os.getcwd())
 
         if not self.output.exists():
             self.output.mkdir(parents=True, exist_ok=True)
@@ -269,83 +576,52 @@ class PromptyTracer:
             frame = self.stack[-1]
             frame["__time"] = {
                 "start": datetime.now(),
+                "start_ns": time.perf_counter_ns(),
             }
 
-            def add(key: str, value: Any) -> None:
-                if key not in frame:
-                    frame[key] = value
-                # multiple values creates list
-                else:
-                    if isinstance(frame[key], list):
-                        frame[key].append(value)
-                    else:
-                        frame[key] = [frame[key], value]
-
-            yield add
+            yield _Frame(frame).add
         finally:
             frame = self.stack.pop()
             start: datetime = frame["__time"]["start"]
-            end: datetime = datetime.now()
+            elapsed: int = time.perf_counter_ns() - frame["__time"]["start_ns"]
 
-            # add duration to frame
+            # add duration to frame, timestamps are formatted on write
             frame["__time"] = {
-                "start": start.strftime("%Y-%m-%dT%H:%M:%S.%f"),
-                "end": end.strftime("%Y-%m-%dT%H:%M:%S.%f"),
-                "duration": int((end - start).total_seconds() * 1000),
+                "start": start,
+                "end": start + timedelta(microseconds=elapsed // 1000),
+                "duration": elapsed // 1_000_000,
             }
 
+            usage: Counter = Counter()
             # hoist usage to parent frame
-            if "result" in frame and isinstance(frame["result"], dict):
-                if "usage" in frame["result"]:
-                    frame["__usage"] = self.hoist_item(
-                        frame["result"]["usage"],
-                        frame["__usage"] if "__usage" in frame else {},
-                    )
-
+            result = frame.get("result")
+            if isinstance(result, dict):
+                _merge_usage(usage, result.get("usage"))
             # streamed results may have usage as well
-            if "result" in frame and isinstance(frame["result"], list):
-                for result in frame["result"]:
-                    if (
-                        isinstance(result, dict)
-                        and "usage" in result
-                        and isinstance(result["usage"], dict)
-                    ):
-                        frame["__usage"] = self.hoist_item(
-                            result["usage"],
-                            frame["__usage"] if "__usage" in frame else {},
-                        )
+            elif isinstance(result, list):
+                for item in result:
+                    if isinstance(item, dict):
+                        _merge_usage(usage, item.get("usage"))
 
             # add any usage frames from below
-            if "__frames" in frame:
-                for child in frame["__frames"]:
-                    if "__usage" in child:
-                        frame["__usage"] = self.hoist_item(
-                            child["__usage"],
-                            frame["__usage"] if "__usage" in frame else {},
-                        )
+            for child in frame.get("__frames", ()):
+                _merge_usage(usage, child.get("__usage"))
+
+            if usage:
+                frame["__usage"] = dict(usage)
 
             # if stack is empty, dump the frame
-            if len(self.stack) == 0:
+            if not self.stack:
                 self.write_trace(frame)
             # otherwise, append the frame to the parent
             else:
-                if "__frames" not in self.stack[-1]:
-                    self.stack[-1]["__frames"] = []
-                self.stack[-1]["__frames"].append(frame)
+                self.stack[-1].setdefault("__frames", []).append(frame)
 
     def hoist_item(self, src: dict[str, Any], cur: dict[str, Any]) -> dict[str, Any]:
-        for key, value in src.items():
-            if value is None or isinstance(value, list) or isinstance(value, dict):
-                continue
-            try:
-                if key not in cur:
-                    cur[key] = value
-                else:
-                    cur[key] += value
-            except Exception:
-                # TODO: Be more specific about exceptions here
-                continue
-
+        # sums the numeric usage counters of src into cur
+        usage = Counter({k: v for k, v in cur.items() if isinstance(v, Number)})
+        _merge_usage(usage, src)
+        cur.update(usage)
         return cur
 
     def write_trace(self, frame: dict[str, Any]) -> None:
@@ -354,15 +630,19 @@ class PromptyTracer:
             / f"{frame['name']}.{datetime.now().strftime('%Y%m%d.%H%M%S')}.tracy"
         )
 
-        v = importlib.metadata.version("prompty")
         enriched_frame = {
             "runtime": "python",
-            "version": v,
+            "version": _version(),
             "trace": frame,
         }
 
-        with open(trace_file, "w") as f:
-            json.dump(enriched_frame, f, indent=4)
+        # serialize here, the file itself is written in the background
+        _submit_write(trace_file, _dumps(enriched_frame))
+
+    def flush(self, timeout: Union[float, None] = None) -> bool:
+        # wait until every queued trace file has been written,
+        # False when the timeout expired first
+        return _flush_writes(timeout)
 
 
 @contextlib.contextmanager
@@ -1,6 +1,8 @@
 import prompty
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from prompty.tracer import to_dict
+from prompty.tracer import sanitize, to_dict
 
 
 class TestCore:
@@ -14,6 +16,34 @@ class TestCore:
         assert d["template"]["type"] == "jinja2"
 
 
+    def test_to_dict_values(self, **kwargs):
+        when = datetime(2024, 1, 2, 3, 4, 5)
+        d = to_dict(
+            {
+                "text": "hello",
+                "count": 3,
+                "ratio": 0.5,
+                "flag": True,
+                "when": when,
+                "path": Path("/path/to/file"),
+                "items": [1, "two", {"three": 3}],
+                "ordered": OrderedDict(a=1),
+                "other": (1, 2),
+            }
+        )
+        assert d == {
+            "text": "hello",
+            "count": 3,
+            "ratio": 0.5,
+            "flag": True,
+            "when": when.isoformat(),
+            "path": str(Path("/path/to/file")),
+            "items": [1, "two", {"three": 3}],
+            "ordered": {"a": 1},
+            "other": "(1, 2)",
+        }
+
+
     def test_prompty_to_safe_dict(self, **kwargs):
         prompt_file_base = "prompts/fake.prompty"
         p_base = prompty.load(prompt_file_base)
@@ -49,3 +79,23 @@ class TestCore:
         prompt_template = prompty.InvokerFactory.run_renderer(p, data)
         parsed = prompty.InvokerFactory.run_parser(p, prompt_template)
         assert parsed == "You are a helpful assistant,\nwhere is Microsoft?"
+
+
+    def test_sanitize(self, **kwargs):
+        d = sanitize(
+            "configuration",
+            {
+                "type": "azure",
+                "api_key": "abc",
+                "Client_Secret": "def",
+                "nested": {"PASSWORD": "ghi", "port": 1},
+                "keys": ["jkl"],
+            },
+        )
+        assert d == {
+            "type": "azure",
+            "api_key": "**********",
+            "Client_Secret": "**********",
+            "nested": {"PASSWORD": "**********", "port": 1},
+            "keys": ["jkl"],
+        }
@@ -1,8 +1,16 @@
+import contextlib
+import json
+import os
+import queue
+import shutil
+import threading
 from collections.abc import AsyncIterator
+from datetime import datetime
 
 import pytest
 
 import prompty
+import prompty.tracer
 from prompty.azure import AzureOpenAIProcessor
 from prompty.invoker import InvokerFactory
 from prompty.serverless.processor import ServerlessProcessor
@@ -317,3 +325,285 @@ async def test_named_tracer_async():
     with Tracer.start("Test1", {Tracer.SIGNATURE: "test1", "two": 2}) as trace:
         trace(Tracer.INPUTS, 3)
         trace(Tracer.RESULT, 4)
+
+
+@pytest.fixture
+def captured():
+    frames: list[dict] = []
+
+    @contextlib.contextmanager
+    def capture_tracer(name: str):
+        frame: dict = {"name": name}
+        frames.append(frame)
+        yield lambda key, value: frame.update({key: value})
+
+    tracers = dict(Tracer._tracers)
+    Tracer.add("capture", capture_tracer)
+    yield frames
+    Tracer.clear()
+    for key, value in tracers.items():
+        Tracer.add(key, value)
+
+
+@trace
+def add_values(a, b=2, *, c=3):
+    return a + b + c
+
+
+@trace
+def scale(value, factor=10):
+    return value * factor
+
+
+@trace
+async def scale_async(value, factor=10):
+    return value * factor
+
+
+class Calculator:
+    @trace
+    def total(self, values):
+        return sum(values)
+
+
+def test_trace_inputs(captured):
+    scale(1)
+    scale(2, factor=3)
+    scale(factor=4, value=5)
+    Calculator().total([1, 2])
+    add_values(1, c=5)
+
+    assert [frame["inputs"] for frame in captured] == [
+        {"value": 1, "factor": 10},
+        {"value": 2, "factor": 3},
+        {"value": 5, "factor": 4},
+        {"values": [1, 2]},
+        {"a": 1, "b": 2, "c": 5},
+    ]
+
+
+def test_trace_inputs_bad_arguments(captured):
+    with pytest.raises(TypeError):
+        scale(1, 2, 3)
+    with pytest.raises(TypeError):
+        scale(1, value=2)
+    with pytest.raises(TypeError):
+        scale(factor=2)
+
+
+@trace(name="renamed")
+def named_values(a):
+    return a
+
+
+def test_trace_name_repeated_calls(captured):
+    named_values(1)
+    named_values(2)
+
+    assert [frame["name"] for frame in captured] == ["renamed", "renamed"]
+    assert [frame["function"] for frame in captured] == ["named_values", "named_values"]
+    assert captured[0]["signature"] == f"{__name__}.named_values"
+
+
+@pytest.fixture
+def no_tracers():
+    tracers = dict(Tracer._tracers)
+    Tracer.clear()
+    yield
+    for key, value in tracers.items():
+        Tracer.add(key, value)
+
+
+@pytest.mark.asyncio
+async def test_trace_without_tracers(no_tracers):
+    assert scale(2) == 20
+    assert await scale_async(3) == 30
+    with Tracer.start("Test1", {Tracer.SIGNATURE: "test1"}) as t:
+        assert t(Tracer.INPUTS, 1) == []
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_prompty_tracer_output(tmp_path, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(prompty.tracer, "orjson", None)
+
+    json_tracer = PromptyTracer(output_dir=str(tmp_path))
+    with json_tracer.tracer("outer") as outer:
+        outer("inputs", {"a": 1})
+        with json_tracer.tracer("inner") as inner:
+            inner("result", {"usage": {"prompt_tokens": 2, "total_tokens": 3}})
+        with json_tracer.tracer("stream") as stream:
+            stream(
+                "result",
+                [
+                    {"usage": None},
+                    {"usage": {"prompt_tokens": 1, "total_tokens": 4, "details": {"cached": 1}}},
+                ],
+            )
+        outer("result", "done")
+        outer("tags", ["a"])
+        outer("tags", ["b"])
+        outer("tags", ["c"])
+
+    json_tracer.flush()
+    files = list(tmp_path.glob("outer.*.tracy"))
+    assert len(files) == 1
+    content = json.loads(files[0].read_text())
+    assert content["runtime"] == "python"
+
+    trace = content["trace"]
+    assert trace["name"] == "outer"
+    assert trace["inputs"] == {"a": 1}
+    assert trace["result"] == "done"
+    assert trace["tags"] == [["a"], ["b"], ["c"]]
+    assert trace["__usage"] == {"prompt_tokens": 3, "total_tokens": 7}
+    assert [frame["name"] for frame in trace["__frames"]] == ["inner", "stream"]
+
+    start = datetime.strptime(trace["__time"]["start"], "%Y-%m-%dT%H:%M:%S.%f")
+    end = datetime.strptime(trace["__time"]["end"], "%Y-%m-%dT%H:%M:%S.%f")
+    assert start <= end
+    assert trace["__time"]["duration"] >= 0
+
+
+@trace
+def connect(endpoint, api_key, options):
+    return {"endpoint": endpoint, "client_secret": "hidden"}
+
+
+def test_trace_sanitizes_values(captured):
+    connect("https://fake", "abc", {"password": "def", "retries": 3, "keys": ["ghi"]})
+
+    frame = captured[0]
+    assert frame["inputs"] == {
+        "endpoint": "https://fake",
+        "api_key": "**********",
+        "options": {"password": "**********", "retries": 3, "keys": ["ghi"]},
+    }
+    assert frame["result"] == {"endpoint": "https://fake", "client_secret": "**********"}
+
+
+@pytest.fixture
+def no_exceptions():
+    Tracer.capture_exceptions = False
+    yield
+    Tracer.capture_exceptions = True
+
+
+def failing(value):
+    raise ValueError(value)
+
+
+def test_trace_exception_capture(captured):
+    with pytest.raises(ValueError):
+        trace(failing)("boom")
+
+    exception = captured[0]["result"]["exception"]
+    assert exception["type"] == "ValueError"
+    assert exception["message"] == "boom"
+    assert exception["traceback"][-1] == "ValueError: boom\n"
+    assert any("in failing" in line for line in exception["traceback"])
+
+
+def test_trace_without_exception_capture(captured, no_exceptions):
+    traced = trace(failing)
+    Tracer.capture_exceptions = True
+    with pytest.raises(ValueError):
+        traced("boom")
+
+    assert captured[0]["inputs"] == {"value": "boom"}
+    assert "result" not in captured[0]
+
+
+def test_prompty_tracer_default_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = PromptyTracer()
+    second = PromptyTracer()
+
+    assert first.output == (tmp_path / ".runs").resolve()
+    assert second.output == first.output
+    assert first.output.is_dir()
+
+
+def test_prompty_tracer_default_output_recreated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = PromptyTracer()
+    shutil.rmtree(first.output)
+
+    second = PromptyTracer()
+    assert second.output.is_dir()
+    with second.tracer("recreated") as recreated:
+        recreated("result", 1)
+
+    second.flush()
+    assert len(list(second.output.glob("recreated.*.tracy"))) == 1
+
+
+def test_prompty_tracer_output_layout(tmp_path, monkeypatch):
+    pytest.importorskip("orjson")
+    frame = {"name": "layout", "values": [1, "two", {"three": None}], "empty": {}}
+    fast = prompty.tracer._dumps(frame)
+    monkeypatch.setattr(prompty.tracer, "orjson", None)
+    assert prompty.tracer._dumps(frame) == fast
+
+
+def test_prompty_tracer_output_large_int(tmp_path):
+    pytest.importorskip("orjson")
+    json_tracer = PromptyTracer(output_dir=str(tmp_path))
+    with json_tracer.tracer("large") as large:
+        large("result", {"n": 2**70})
+
+    json_tracer.flush()
+    files = list(tmp_path.glob("large.*.tracy"))
+    assert len(files) == 1
+    assert json.loads(files[0].read_text())["trace"]["result"] == {"n": 2**70}
+
+
+def test_prompty_tracer_usage(tmp_path, monkeypatch):
+    json_tracer = PromptyTracer(output_dir=str(tmp_path))
+    cur = {"prompt_tokens": 1, "model": "gpt"}
+    assert json_tracer.hoist_item({"prompt_tokens": 2, "total_tokens": 3, "details": {}}, cur) is cur
+    assert cur == {"prompt_tokens": 3, "model": "gpt", "total_tokens": 3}
+
+    frames: list[dict] = []
+    monkeypatch.setattr(json_tracer, "write_trace", frames.append)
+    with json_tracer.tracer("outer"):
+        with json_tracer.tracer("inner") as inner:
+            inner("result", {"usage": {"prompt_tokens": 2}})
+
+    assert type(frames[0]["__usage"]) is dict
+    assert frames[0]["__usage"] == {"prompt_tokens": 2}
+
+
+def test_prompty_tracer_flush_timeout(tmp_path, monkeypatch, caplog):
+    # a writer that never drains the queue, as on a hung filesystem
+    release = threading.Event()
+    stuck = threading.Thread(target=release.wait, daemon=True)
+    stuck.start()
+    monkeypatch.setattr(prompty.tracer, "_writes", queue.SimpleQueue())
+    monkeypatch.setattr(prompty.tracer, "_writer", stuck)
+
+    try:
+        assert PromptyTracer(output_dir=str(tmp_path)).flush(timeout=0.05) is False
+        assert "Timed out" in caplog.text
+    finally:
+        release.set()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_prompty_tracer_fork_resets_writes(tmp_path):
+    json_tracer = PromptyTracer(output_dir=str(tmp_path))
+    with json_tracer.tracer("parent") as parent:
+        parent("result", 1)
+    pending = prompty.tracer._writes
+    pending.put((tmp_path / "pending.tracy", b"{}"))
+
+    pid = os.fork()
+    if pid == 0:
+        ok = prompty.tracer._writes is not pending and prompty.tracer._writer is None
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert json_tracer.flush(timeout=5)